@@ -1,12 +1,21 @@
 # encoding:utf-8
-import json
+import asyncio
+import atexit
+import codecs
+import concurrent.futures
 import os
 import html
+import random
+import sqlite3
+import threading
+from pathlib import Path
 from urllib.parse import urlparse
-import time
 import re
+import time
 
-import requests
+import aiohttp
+import orjson
+from cachetools import TTLCache
 
 import plugins
 from bridge.context import ContextType
@@ -14,6 +23,17 @@ from bridge.reply import Reply, ReplyType
 from common.log import logger
 from plugins import *
 
+# 手动触发总结的指令
+_TRIGGER = "总结"
+
+# 主程序配置文件路径（插件位于 plugins/jina_sum/ 下），导入时计算一次
+_MAIN_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config.json"
+
+# 归一化 URL 时去掉的 utm_* 跟踪参数，以及去参数后残留的 ? 和 &
+_UTM_PARAM_RE = re.compile(r"(?<=[?&])utm_[^&#]*&?")
+_DANGLING_QUERY_RE = re.compile(r"[?&]+(?=#|$)")
+
+
 @plugins.register(
     name="JinaSum",
     desire_priority=20,
@@ -51,6 +71,21 @@ class JinaSum(Plugin):
         "content_cache_timeout": 300,  # 新增：总结后提问的缓存时间（默认 5 分钟）
     }
 
+    # 批量查询用户昵称的等待时间（秒）和单批最大数量
+    NICK_BATCH_DELAY = 0.05
+    NICK_BATCH_SIZE = 50
+
+    # 用户昵称、群名称缓存的有效期（秒）
+    # 重启后只恢复获取时间不超过有效期一半的持久化记录，恢复的记录会重新计时，
+    # 因此一个名称从获取到失效最长不超过 1.5 倍有效期
+    NAME_CACHE_TTL = 3600
+
+    # 当前生效的插件实例，重载或进程退出时由它负责释放资源
+    _active_instance = None
+
+    # 网络请求遇到临时性错误时的最大重试次数
+    MAX_RETRIES = 3
+
     def __init__(self):
         super().__init__()
         try:
@@ -62,14 +97,25 @@ class JinaSum(Plugin):
             for key, default_value in self.DEFAULT_CONFIG.items():
                 setattr(self, key, self.config.get(key, default_value))
 
-            # 每次启动时重置缓存
-            self.pending_messages = {}  # 待处理消息缓存
+            # 加载分享消息缓存时间
+            self.pending_messages_timeout = self.config.get("pending_messages_timeout", 60)
+
+            # 加载总结后提问的缓存时间
+            self.content_cache_timeout = self.config.get("content_cache_timeout", 300)
+
+            # 每次启动时重置缓存，过期条目在访问时自动淘汰
+            # 缓存会被消息处理线程和后台事件循环同时访问，需加锁
+            self._cache_lock = threading.Lock()
+            self.pending_messages = TTLCache(maxsize=500, ttl=self.pending_messages_timeout)  # 待处理消息缓存
 
             # 添加 qa_trigger 的初始化，设置默认值 "问"
             self.qa_trigger = self.config.get("qa_trigger", "问")
 
-            # 定义缓存字典，按 chat_id 缓存总结内容
-            self.content_cache = {}
+            # 定义缓存，按 chat_id 缓存总结内容
+            self.content_cache = TTLCache(maxsize=500, ttl=self.content_cache_timeout)
+
+            # 按归一化后的 URL 缓存总结结果，重复分享同一篇文章时直接返回
+            self._url_summary_cache = TTLCache(maxsize=2000, ttl=self.content_cache_timeout)
 
             # 加载白名单用户列表
             self.white_user_list = self.config.get("white_user_list", [])
@@ -80,32 +126,73 @@ class JinaSum(Plugin):
             # 加载白名单群组列表
             self.white_group_list = self.config.get("white_group_list", [])
 
-            # 添加用户ID到昵称的缓存字典
-            self.user_nickname_cache = {}
-            self.group_name_cache = {}
+            # 添加用户ID到昵称、群ID到群名称的缓存
+            self.user_nickname_cache = TTLCache(maxsize=5000, ttl=self.NAME_CACHE_TTL)
+            self.group_name_cache = TTLCache(maxsize=2000, ttl=self.NAME_CACHE_TTL)
 
-            # 加载分享消息缓存时间
-            self.pending_messages_timeout = self.config.get("pending_messages_timeout", 60)
+            # 从本地数据库恢复昵称和群名称缓存，避免重启后重复请求 gewechat
+            self._db_lock = threading.Lock()
+            self._db = self._init_name_db()
 
-            # 加载总结后提问的缓存时间
-            self.content_cache_timeout = self.config.get("content_cache_timeout", 300)
+            # 等待批量查询昵称的用户ID，仅在后台事件循环内访问
+            self._pending_nick_lookups = {}
+            self._nick_flush_handle = None
 
             # 加载 OpenAI API 相关配置
             self.open_ai_api_base = self.config.get("open_ai_api_base")
             self.open_ai_api_key = self.config.get("open_ai_api_key")
             self.open_ai_model = self.config.get("open_ai_model")
 
+            # 配置在运行期间不变，预先生成请求地址和请求头
+            self._jina_base = self.jina_reader_base.rstrip("/") + "/"
+            self._openai_chat_url = (self.open_ai_api_base or "").rstrip("/") + "/chat/completions"
+            self._openai_headers = {
+                "Authorization": f"Bearer {self.open_ai_api_key}",
+                "Host": urlparse(self.open_ai_api_base).netloc,
+                "Content-Type": "application/json",
+            }
+
+            self.group_chat_prefix = []
+
             # 加载主配置文件
-            main_config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config.json")
-            if os.path.exists(main_config_path):
-                with open(main_config_path, "r", encoding="utf-8") as f:
-                    main_config = json.load(f)
-                    # 将主配置中的 gewechat 相关配置映射到插件配置中
-                    self.api_base_url = main_config.get("gewechat_base_url")
-                    self.api_token = main_config.get("gewechat_token")
-                    self.app_id = main_config.get("gewechat_app_id")
-                    # 获取群聊前缀列表
-                    self.group_chat_prefix = main_config.get("group_chat_prefix", [])
+            if _MAIN_CONFIG_PATH.is_file():
+                main_config = orjson.loads(_MAIN_CONFIG_PATH.read_bytes())
+                # 将主配置中的 gewechat 相关配置映射到插件配置中
+                self.api_base_url = main_config.get("gewechat_base_url")
+                self.api_token = main_config.get("gewechat_token")
+                self.app_id = main_config.get("gewechat_app_id")
+                # 获取群聊前缀列表
+                self.group_chat_prefix = main_config.get("group_chat_prefix", [])
+
+            # 将 url 黑白名单前缀分别合并预编译为一个正则
+            self._black_url_pattern = self._compile_prefix_pattern(self.black_url_list)
+            self._white_url_pattern = self._compile_prefix_pattern(self.white_url_list)
+
+            # 将群聊前缀和触发指令合并预编译为一个正则，一次匹配同时完成去前缀和触发判断
+            # 允许前缀前后有0个或多个空格，分支按配置顺序尝试，与逐个前缀匹配的结果一致
+            self._group_trigger_pattern = None
+            if self.group_chat_prefix:
+                self._group_trigger_pattern = re.compile(
+                    r"^\s*(?:(?:"
+                    + "|".join(re.escape(prefix) for prefix in self.group_chat_prefix)
+                    + r")\s+)?(?="
+                    + re.escape(_TRIGGER)
+                    + ")"
+                )
+
+            # 后台事件循环，所有网络请求共享一个 aiohttp 会话
+            self._closed = False
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, name="JinaSumLoop", daemon=True
+            )
+            self._loop_thread.start()
+            self._run(self._init_session())
+
+            # 插件重载时宿主会创建新实例，释放旧实例的事件循环、会话和数据库连接
+            previous, JinaSum._active_instance = JinaSum._active_instance, self
+            if previous is not None:
+                previous._shutdown()
 
             logger.info(f"[JinaSum] inited, config={self.config}")
             self.handlers[Event.ON_HANDLE_CONTEXT] = self.on_handle_context
@@ -113,44 +200,185 @@ class JinaSum(Plugin):
             logger.error(f"[JinaSum] 初始化异常：{e}")
             raise "[JinaSum] init failed, ignore"
 
+    async def _init_session(self):
+        """在事件循环内创建共享的 aiohttp 会话"""
+        # 所有主机（jina、OpenAI、gewechat）共用一个连接池并缓存 DNS 解析结果，
+        # 重复请求复用保持的连接；单个主机最多占用 20 个连接
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=20,
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            keepalive_timeout=120,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            # sock_connect 只限制建立 TCP 连接的时间，不包括在连接池中排队等待空闲连接
+            timeout=aiohttp.ClientTimeout(total=60, sock_connect=5),
+        )
+
+    def _shutdown(self):
+        """取消进行中的请求，关闭共享会话和数据库，并停止后台事件循环"""
+        if self._closed or not self._loop.is_running():
+            return
+        self._closed = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        except Exception as e:
+            logger.warning(f"[JinaSum] 关闭会话失败: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _close(self):
+        """在事件循环内取消其余任务，使等待结果的消息处理线程能够返回，再释放资源"""
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._session.close()
+        # 等待线程池中尚未完成的数据库写入，再关闭数据库
+        await self._loop.shutdown_default_executor()
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def _init_name_db(self):
+        """打开昵称缓存数据库，清理过期记录并把较新的记录载入内存缓存，失败时不做持久化"""
+        try:
+            db = sqlite3.connect(
+                os.path.join(self.path, "jina_sum_cache.db"),
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            # WAL 模式下 NORMAL 只在检查点时同步磁盘，缓存数据丢失最近几条也无妨
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS nick(wxid TEXT PRIMARY KEY, name TEXT, ts REAL)")
+            db.execute("CREATE TABLE IF NOT EXISTS chatroom(chatroom_id TEXT PRIMARY KEY, name TEXT, ts REAL)")
+
+            now = time.time()
+            expired = now - self.NAME_CACHE_TTL
+            db.execute("DELETE FROM nick WHERE ts <= ?", (expired,))
+            db.execute("DELETE FROM chatroom WHERE ts <= ?", (expired,))
+
+            since = now - self.NAME_CACHE_TTL / 2
+            for wxid, name in db.execute("SELECT wxid, name FROM nick WHERE ts > ?", (since,)):
+                self.user_nickname_cache[wxid] = name
+            for chatroom_id, name in db.execute("SELECT chatroom_id, name FROM chatroom WHERE ts > ?", (since,)):
+                self.group_name_cache[chatroom_id] = name
+            return db
+        except Exception as e:
+            logger.warning(f"[JinaSum] 打开昵称缓存数据库失败，昵称缓存不会持久化: {e}")
+            return None
+
+    def _save_names(self, sql, names):
+        """将查询到的昵称或群名称写入数据库，在线程池中执行，避免磁盘写入阻塞事件循环"""
+        if not self._db or not names:
+            return
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._db.executemany(sql, [(key, name, now) for key, name in names.items()])
+        except Exception as e:
+            logger.warning(f"[JinaSum] 写入昵称缓存数据库失败: {e}")
+
+    def _run(self, coro, default=None):
+        """在后台事件循环中执行协程，并同步等待结果；插件已关闭或任务被取消时返回 default"""
+        if self._closed:
+            coro.close()
+            return default
+        try:
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+        except concurrent.futures.CancelledError:
+            logger.warning("[JinaSum] 插件已关闭，放弃处理中的请求")
+            return default
+
     def _get_user_nickname(self, user_id):
         """获取用户昵称"""
-        if user_id in self.user_nickname_cache:
-            return self.user_nickname_cache[user_id]
+        with self._cache_lock:
+            nickname = self.user_nickname_cache.get(user_id)
+        if nickname is not None:
+            return nickname
+        return self._run(self._fetch_user_nickname(user_id), default=user_id)
+
+    async def _fetch_user_nickname(self, user_id):
+        """获取用户昵称，短时间内的多个查询会合并为一次批量请求"""
+        future = self._pending_nick_lookups.get(user_id)
+        if future is None:
+            future = self._loop.create_future()
+            self._pending_nick_lookups[user_id] = future
+            if self._nick_flush_handle is None:
+                self._nick_flush_handle = self._loop.call_later(
+                    self.NICK_BATCH_DELAY, lambda: self._loop.create_task(self._flush_nicks())
+                )
+        # 多个调用方共享同一个 future，避免其中一个被取消时影响其他调用方
+        return await asyncio.shield(future)
+
+    async def _flush_nicks(self):
+        """批量调用API获取排队中的用户昵称"""
+        self._nick_flush_handle = None
+        user_ids = list(self._pending_nick_lookups)[: self.NICK_BATCH_SIZE]
+        futures = {user_id: self._pending_nick_lookups.pop(user_id) for user_id in user_ids}
+        if self._pending_nick_lookups:
+            # 超出单批上限的部分立即进入下一批
+            self._nick_flush_handle = self._loop.call_soon(
+                lambda: self._loop.create_task(self._flush_nicks())
+            )
 
+        nicknames = {}
         try:
-            # 调用API获取用户信息
-            response = requests.post(
+            async with self._session.post(
                 f"{self.api_base_url}/contacts/getBriefInfo",
                 headers={
                     "X-GEWE-TOKEN": self.api_token,
+                    "Content-Type": "application/json",
                 },
-                json={
+                data=orjson.dumps({
                     "appId": self.app_id,
-                    "wxids": [user_id],
-                },
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ret") == 200 and data.get("data"):
-                    nickname = data["data"][0].get("nickName", user_id)
-                    self.user_nickname_cache[user_id] = nickname
-                    return nickname
+                    "wxids": user_ids,
+                }),
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    if data.get("ret") == 200 and data.get("data"):
+                        infos = data["data"]
+                        # 只有条数与请求一致时，缺少 userName 的条目才按位置对应，避免昵称错配
+                        by_position = len(infos) == len(user_ids)
+                        for index, info in enumerate(infos):
+                            user_id = info.get("userName")
+                            if not user_id and by_position:
+                                user_id = user_ids[index]
+                            if user_id not in futures:
+                                continue
+                            nickname = info.get("nickName")
+                            if nickname:
+                                nicknames[user_id] = nickname
+                                with self._cache_lock:
+                                    self.user_nickname_cache[user_id] = nickname
         except Exception as e:
             logger.error(f"[JinaSum] 获取用户昵称失败: {e}")
 
-        return user_id
+        for user_id, future in futures.items():
+            if not future.done():
+                future.set_result(nicknames.get(user_id, user_id))
+
+        self._loop.run_in_executor(
+            None, self._save_names, "INSERT OR REPLACE INTO nick(wxid, name, ts) VALUES (?, ?, ?)", nicknames
+        )
 
     def _get_group_name(self, group_id):
         """获取群名称"""
         # 检查缓存
-        if group_id in self.group_name_cache:
-            logger.debug(f"[JinaSum] 从缓存获取群名称: {group_id} -> {self.group_name_cache[group_id]}")
-            return self.group_name_cache[group_id]
-
+        with self._cache_lock:
+            group_name = self.group_name_cache.get(group_id)
+        if group_name is not None:
+            logger.debug(f"[JinaSum] 从缓存获取群名称: {group_id} -> {group_name}")
+            return group_name
+        return self._run(self._fetch_group_name(group_id), default=group_id)
+
+    async def _fetch_group_name(self, group_id):
+        """调用群信息API获取群名称"""
         try:
-            # 调用群信息API
             api_url = f"{self.api_base_url}/group/getChatroomInfo"
             payload = {
                 "appId": self.app_id,
@@ -158,25 +386,32 @@ class JinaSum(Plugin):
             }
             headers = {
                 "X-GEWE-TOKEN": self.api_token,
+                "Content-Type": "application/json",
             }
 
-            response = requests.post(api_url, headers=headers, json=payload)
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ret") == 200 and data.get("data"):
-                    group_info = data["data"]
-                    group_name = group_info.get("nickName")  # 使用 nickName 字段
-
-                    if group_name:
-                        self.group_name_cache[group_id] = group_name
-                        return group_name
+            async with self._session.post(api_url, headers=headers, data=orjson.dumps(payload)) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    if data.get("ret") == 200 and data.get("data"):
+                        group_info = data["data"]
+                        group_name = group_info.get("nickName")  # 使用 nickName 字段
+
+                        if group_name:
+                            with self._cache_lock:
+                                self.group_name_cache[group_id] = group_name
+                            self._loop.run_in_executor(
+                                None,
+                                self._save_names,
+                                "INSERT OR REPLACE INTO chatroom(chatroom_id, name, ts) VALUES (?, ?, ?)",
+                                {group_id: group_name},
+                            )
+                            return group_name
+                        else:
+                            logger.warning(f"[JinaSum] API返回的群名为空 - Group ID: {group_id}")
+                            return group_id
                     else:
-                        logger.warning(f"[JinaSum] API返回的群名为空 - Group ID: {group_id}")
+                        logger.warning(f"[JinaSum] API返回数据异常: {data}")
                         return group_id
-                else:
-                    logger.warning(f"[JinaSum] API返回数据异常: {data}")
-                    return group_id
         except Exception as e:
             logger.error(f"[JinaSum] 获取群名称失败: {e}")
             return group_id
@@ -205,47 +440,39 @@ class JinaSum(Plugin):
             return
 
         content = context.content
-        channel = e_context["channel"]
         msg = e_context["context"]["msg"]
 
         is_group = msg.is_group
 
-        # 获取 chat_id (群名称或用户昵称)
-        if is_group:
-            chat_id = self._get_group_name(msg.from_user_id)
-        else:
-            chat_id = self._get_user_nickname(msg.from_user_id)
-
-        # 检查是否需要自动总结
-        should_auto_sum = self._should_auto_summarize(chat_id, is_group)
-
-        # 清理过期缓存
-        self._clean_expired_cache()
-
         # 处理分享消息
         if context.type == ContextType.SHARING:
-            logger.debug(f"[JinaSum] Processing SHARING message, chat_id: {chat_id}")
-            # 检查 URL 是否有效
+            # 检查 URL 是否有效，无效时无需再查询群名称或用户昵称
             if not self._check_url(content):
                 reply = Reply(ReplyType.TEXT, "无效的URL或被禁止的URL。")
                 e_context["reply"] = reply
                 e_context.action = EventAction.BREAK_PASS
                 return
+
+            chat_id = self._get_chat_id(msg)
+            logger.debug(f"[JinaSum] Processing SHARING message, chat_id: {chat_id}")
+
+            # 检查是否需要自动总结
+            should_auto_sum = self._should_auto_summarize(chat_id, is_group)
             if is_group:
                 if should_auto_sum:
-                    return self._process_summary(content, e_context, chat_id, retry_count=0)
+                    return self._run(self._process_summary(content, e_context, chat_id))
                 else:
-                    self.pending_messages[chat_id] = {
-                        "content": content,
-                        "timestamp": time.time(),
-                    }
+                    with self._cache_lock:
+                        self.pending_messages[chat_id] = {
+                            "content": content,
+                        }
                     logger.debug(
                         f"[JinaSum] Cached SHARING message: {content}, chat_id: {chat_id}"
                     )
                     return
             else:  # 单聊消息
                 if should_auto_sum:
-                    return self._process_summary(content, e_context, chat_id, retry_count=0)
+                    return self._run(self._process_summary(content, e_context, chat_id))
                 else:
                     logger.debug(
                         f"[JinaSum] User {chat_id} not in whitelist, require '总结' to trigger summary"
@@ -254,36 +481,20 @@ class JinaSum(Plugin):
 
         # 处理文本消息
         elif context.type == ContextType.TEXT:
-            logger.debug(f"[JinaSum] Processing TEXT message, chat_id: {chat_id}")
             content = content.strip()
 
-            # 获取群聊前缀列表
-            group_chat_prefix = self.group_chat_prefix
-
-            # 处理群聊消息
-            if is_group:
-                # 遍历前缀列表，检查消息内容是否以这些前缀开头，允许前缀前后有0个或多个空格
-                for prefix in group_chat_prefix:
-                    pattern = r'^\s*{}\s+'.format(re.escape(prefix))
-                    if re.match(pattern, content):
-                        # 去掉前缀和前后的空格
-                        content = re.sub(pattern, '', content)
-                        break
-                # 检查处理后的内容是否以“总结”开头
-                if content.startswith("总结"):
-                    is_trigger = True
-                else:
-                    is_trigger = False
-            else:
-                # 私聊，直接检查是否以“总结”开头
-                if content.startswith("总结"):
-                    is_trigger = True
-                else:
-                    is_trigger = False
-
-            if not is_trigger:
+            # 检查（去掉群聊前缀后的）内容是否以“总结”开头，普通聊天消息到此为止，不查询群名称或用户昵称
+            if is_group and self._group_trigger_pattern:
+                match = self._group_trigger_pattern.match(content)
+                if not match:
+                    return
+                content = content[match.end():]
+            elif not content.startswith(_TRIGGER):
                 return
 
+            chat_id = self._get_chat_id(msg)
+            logger.debug(f"[JinaSum] Processing TEXT message, chat_id: {chat_id}")
+
             # 解析命令
             clist = content.split()
             url = clist[1] if len(clist) > 1 else None
@@ -291,173 +502,244 @@ class JinaSum(Plugin):
             # 检查是否是直接URL总结
             if url and self._check_url(url):
                 logger.debug(f"[JinaSum] Processing direct URL: {url}")
-                return self._process_summary(url, e_context, chat_id, retry_count=0)
-            elif chat_id in self.pending_messages:
-                cached_content = self.pending_messages[chat_id]["content"]
+                return self._run(self._process_summary(url, e_context, chat_id))
+
+            with self._cache_lock:
+                pending = self.pending_messages.pop(chat_id, None)
+            if pending:
+                cached_content = pending["content"]
                 logger.debug(f"[JinaSum] Processing cached content: {cached_content}")
-                del self.pending_messages[chat_id]
-                return self._process_summary(
-                    cached_content, e_context, chat_id, retry_count=0, skip_notice=True
+                return self._run(
+                    self._process_summary(
+                        cached_content, e_context, chat_id, skip_notice=True
+                    )
                 )
             else:
                 logger.debug("[JinaSum] No content to summarize")
                 return
 
-    def _clean_expired_cache(self):
-        """清理过期的缓存"""
-        current_time = time.time()
-        # 清理待处理消息缓存
-        expired_keys = [
-            k
-            for k, v in self.pending_messages.items()
-            if current_time - v["timestamp"] > self.pending_messages_timeout
-        ]
-        for k in expired_keys:
-            del self.pending_messages[k]
-
-        # 清理 content_cache 中过期的数据
-        expired_chat_ids = [
-            k
-            for k, v in self.content_cache.items()
-            if current_time - v["timestamp"] > self.content_cache_timeout
-        ]
-        for k in expired_chat_ids:
-            del self.content_cache[k]
-
-    def _process_summary(self, content: str, e_context: EventContext, chat_id: str, retry_count: int = 0, skip_notice: bool = False):
+    def _get_chat_id(self, msg):
+        """获取 chat_id (群名称或用户昵称)"""
+        if msg.is_group:
+            return self._get_group_name(msg.from_user_id)
+        return self._get_user_nickname(msg.from_user_id)
+
+    async def _process_summary(self, content: str, e_context: EventContext, chat_id: str, skip_notice: bool = False):
         """处理总结请求
 
         Args:
             content: 要处理的内容
             e_context: 事件上下文
             chat_id: 群名称或用户昵称
-            retry_count: 重试次数
             skip_notice: 是否跳过提示消息
         """
-        try:
-            if retry_count == 0 and not skip_notice:
-                logger.debug(f"[JinaSum] Processing URL: {content}, chat_id: {chat_id}")
-                reply = Reply(ReplyType.TEXT, "🎉正在为您生成总结，请稍候...")
-                channel = e_context["channel"]
-                channel.send(reply, e_context["context"])
+        target_url = html.unescape(content).strip()
+        cache_key = self._canonical_url(target_url)
+        with self._cache_lock:
+            cached = self._url_summary_cache.get(cache_key)
+            if cached:
+                self.content_cache[chat_id] = {
+                    "url": target_url,
+                    "content": cached["content"],
+                }
+        if cached:
+            logger.debug(f"[JinaSum] Using cached summary for url: {cache_key}")
+            e_context["reply"] = Reply(ReplyType.TEXT, cached["summary"])
+            e_context.action = EventAction.BREAK_PASS
+            return
 
-            # 获取网页内容
-            target_url = html.unescape(content)
-            jina_url = self._get_jina_url(target_url)
-            logger.debug(f"[JinaSum] Requesting jina url: {jina_url}")
+        notice = None
+        if not skip_notice:
+            logger.debug(f"[JinaSum] Processing URL: {content}, chat_id: {chat_id}")
+            notice = self._send_notice(e_context, "🎉正在为您生成总结，请稍候...")
 
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
-            }
+        # 获取网页内容
+        jina_url = self._jina_base + target_url
+        logger.debug(f"[JinaSum] Requesting jina url: {jina_url}")
+
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+        }
+        # 获取网页内容的同时预热到 OpenAI 的连接，只预热一次，重试时不再重复
+        warm = asyncio.ensure_future(self._warm_up_openai())
+        for attempt in range(self.MAX_RETRIES + 1):
             try:
-                response = requests.get(jina_url, headers=headers, timeout=60)
-                response.raise_for_status()
-                target_url_content = response.text
+                target_url_content = await self._fetch_jina_content(jina_url, headers)
                 if not target_url_content:
                     raise ValueError("Empty response from jina reader")
+                break
             except Exception as e:
                 logger.error(f"[JinaSum] Failed to get content from jina reader: {str(e)}")
-                raise
+                if attempt < self.MAX_RETRIES and self._is_transient_error(e):
+                    logger.info(f"[JinaSum] Retrying {attempt + 1}/{self.MAX_RETRIES}...")
+                    await asyncio.sleep(self._retry_delay(attempt))
+                    continue
+                warm.cancel()
+                await self._wait_notice(notice)
+                reply = Reply(ReplyType.ERROR, f"无法获取该内容: {str(e)}")
+                e_context["reply"] = reply
+                e_context.action = EventAction.BREAK_PASS
+                return
 
-            # 限制内容长度
-            target_url_content = target_url_content[: self.max_words]
-            logger.debug(f"[JinaSum] Got content length: {len(target_url_content)}")
+        # 内容在读取时已按 max_words 截断
+        logger.debug(f"[JinaSum] Got content length: {len(target_url_content)}")
 
-            # 调用 OpenAI API 进行总结
-            try:
-                openai_payload = self._get_openai_payload(
-                    target_url_content=target_url_content
-                )
-                openai_headers = self._get_openai_headers()
-                openai_chat_url = self._get_openai_chat_url()
-                response = requests.post(
-                    openai_chat_url, headers=openai_headers, json=openai_payload, timeout=60
-                )
+        # 调用 OpenAI API 进行总结；预热尚未完成时直接放弃，不让总结请求等待它
+        if not warm.done():
+            warm.cancel()
+        try:
+            openai_payload = self._get_openai_payload(
+                target_url_content=target_url_content
+            )
+            async with self._session.post(
+                self._openai_chat_url,
+                headers=self._openai_headers,
+                data=orjson.dumps(openai_payload),
+            ) as response:
                 response.raise_for_status()
-                summary = response.json()["choices"][0]["message"]["content"]
-                reply = Reply(ReplyType.TEXT, summary)
-                e_context["reply"] = reply
-                e_context.action = EventAction.BREAK_PASS
+                data = orjson.loads(await response.read())
+            summary = data["choices"][0]["message"]["content"]
+            await self._wait_notice(notice)
+            reply = Reply(ReplyType.TEXT, summary)
+            e_context["reply"] = reply
+            e_context.action = EventAction.BREAK_PASS
 
-                # 缓存内容和时间戳，按 chat_id 缓存
+            # 缓存内容，按 chat_id 缓存
+            with self._cache_lock:
                 self.content_cache[chat_id] = {
                     "url": target_url,
                     "content": target_url_content,
-                    "timestamp": time.time(),
                 }
-                logger.debug(f"[JinaSum] Content cached for chat_id: {chat_id}")
-
-            except Exception as e:
-                logger.error(f"[JinaSum] Failed to get summary from OpenAI: {str(e)}")
-                reply = Reply(ReplyType.ERROR, f"内容总结出现错误: {str(e)}")
-                e_context["reply"] = reply
-                e_context.action = EventAction.BREAK_PASS
+                self._url_summary_cache[cache_key] = {
+                    "summary": summary,
+                    "content": target_url_content,
+                }
+            logger.debug(f"[JinaSum] Content cached for chat_id: {chat_id}")
 
         except Exception as e:
-            logger.error(f"[JinaSum] Error in processing summary: {str(e)}", exc_info=True)
-            if retry_count < 3:
-                logger.info(f"[JinaSum] Retrying {retry_count + 1}/3...")
-                return self._process_summary(content, e_context, chat_id, retry_count + 1)
-            reply = Reply(ReplyType.ERROR, f"无法获取该内容: {str(e)}")
+            logger.error(f"[JinaSum] Failed to get summary from OpenAI: {str(e)}")
+            await self._wait_notice(notice)
+            reply = Reply(ReplyType.ERROR, f"内容总结出现错误: {str(e)}")
             e_context["reply"] = reply
             e_context.action = EventAction.BREAK_PASS
 
-    def _process_question(
-        self, question: str, chat_id: str, e_context: EventContext, retry_count: int = 0
-    ):
-        """处理用户提问"""
+    def _send_notice(self, e_context: EventContext, text: str):
+        """在线程池中发送提示消息，发送与后续请求同时进行，返回发送任务的 future"""
+        reply = Reply(ReplyType.TEXT, text)
+        return self._loop.run_in_executor(
+            None, e_context["channel"].send, reply, e_context["context"]
+        )
+
+    @staticmethod
+    async def _wait_notice(notice):
+        """设置回复前等待提示消息发送完成，保证提示消息先于回复送达"""
+        if notice is None:
+            return
         try:
-            # 使用 chat_id (群名称或用户昵称) 作为键从 content_cache 中获取缓存内容
-            cache_data = self.content_cache.get(chat_id)
-            if (
-                cache_data
-                and time.time() - cache_data["timestamp"] <= self.content_cache_timeout
-            ):
-                recent_content = cache_data["content"]
+            await notice
+        except Exception as e:
+            logger.warning(f"[JinaSum] 发送提示消息失败: {e}")
+
+    @staticmethod
+    def _canonical_url(url):
+        """去掉 utm_* 跟踪参数，使仅跟踪参数不同的 URL 共用一个缓存条目"""
+        if "utm_" not in url:
+            return url
+        return _DANGLING_QUERY_RE.sub("", _UTM_PARAM_RE.sub("", url))
+
+    @staticmethod
+    def _is_transient_error(e):
+        """判断是否为值得重试的临时性错误（连接失败、超时、限流或服务端错误）"""
+        if isinstance(e, aiohttp.ClientResponseError):
+            return e.status == 429 or e.status >= 500
+        return isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+    @staticmethod
+    def _retry_delay(attempt):
+        """指数退避并加入随机抖动，避免集中重试压垮服务"""
+        return min(2 ** attempt, 8) + random.random() * 0.5
+
+    async def _fetch_jina_content(self, jina_url, headers):
+        """通过 jina reader 获取网页内容，读满 max_words 个字符后即停止下载"""
+        async with self._session.get(jina_url, headers=headers) as response:
+            response.raise_for_status()
+            decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+            parts = []
+            remaining = self.max_words
+            async for chunk in response.content.iter_chunked(8192):
+                text = decoder.decode(chunk)
+                if len(text) >= remaining:
+                    parts.append(text[:remaining])
+                    break
+                parts.append(text)
+                remaining -= len(text)
             else:
-                logger.debug(
-                    f"[JinaSum] No valid content cache found or content expired for chat_id: {chat_id}"
-                )
-                reply = Reply(ReplyType.TEXT, "总结内容已过期或不存在，请重新总结后重试。")
-                e_context["reply"] = reply
-                e_context.action = EventAction.BREAK_PASS
-                return
-
-            if retry_count == 0:
-                reply = Reply(ReplyType.TEXT, "🤔 正在思考您的问题，请稍候...")
-                channel = e_context["channel"]
-                channel.send(reply, e_context["context"])
-
-            # 准备问答请求
-            openai_chat_url = self._get_openai_chat_url()
-            openai_headers = self._get_openai_headers()
+                parts.append(decoder.decode(b"", final=True)[:remaining])
+            return "".join(parts)
 
-            # 构建问答的 prompt
-            qa_prompt = f"Given the content:\n'''{recent_content[:self.max_words]}'''\n\nAnswer the question: {question}"
-
-            openai_payload = {
-                "model": self.open_ai_model,
-                "messages": [{"role": "user", "content": qa_prompt}],
-            }
+    async def _warm_up_openai(self):
+        """预先建立到 OpenAI 的连接，供随后的总结请求复用，失败不影响总结"""
+        try:
+            async with self._session.head(
+                self.open_ai_api_base, timeout=aiohttp.ClientTimeout(total=10)
+            ):
+                pass
+        except Exception as e:
+            logger.debug(f"[JinaSum] OpenAI warm-up failed: {e}")
 
-            # 调用 API 获取回答
-            response = requests.post(
-                openai_chat_url, headers=openai_headers, json=openai_payload, timeout=60
+    async def _process_question(self, question: str, chat_id: str, e_context: EventContext):
+        """处理用户提问"""
+        # 使用 chat_id (群名称或用户昵称) 作为键从 content_cache 中获取缓存内容
+        with self._cache_lock:
+            cache_data = self.content_cache.get(chat_id)
+        if cache_data:
+            recent_content = cache_data["content"]
+        else:
+            logger.debug(
+                f"[JinaSum] No valid content cache found or content expired for chat_id: {chat_id}"
             )
-            response.raise_for_status()
-            answer = response.json()["choices"][0]["message"]["content"]
-
-            reply = Reply(ReplyType.TEXT, answer)
+            reply = Reply(ReplyType.TEXT, "总结内容已过期或不存在，请重新总结后重试。")
             e_context["reply"] = reply
             e_context.action = EventAction.BREAK_PASS
+            return
 
-        except Exception as e:
-            logger.error(f"[JinaSum] Error in processing question: {str(e)}")
-            if retry_count < 3:
-                return self._process_question(question, chat_id, e_context, retry_count + 1)
-            reply = Reply(ReplyType.ERROR, f"抱歉，处理您的问题时出错: {str(e)}")
-            e_context["reply"] = reply
-            e_context.action = EventAction.BREAK_PASS
+        notice = self._send_notice(e_context, "🤔 正在思考您的问题，请稍候...")
+
+        # 构建问答的 prompt
+        qa_prompt = f"Given the content:\n'''{recent_content}'''\n\nAnswer the question: {question}"
+
+        openai_payload = {
+            "model": self.open_ai_model,
+            "messages": [{"role": "user", "content": qa_prompt}],
+        }
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                # 调用 API 获取回答
+                async with self._session.post(
+                    self._openai_chat_url,
+                    headers=self._openai_headers,
+                    data=orjson.dumps(openai_payload),
+                ) as response:
+                    response.raise_for_status()
+                    data = orjson.loads(await response.read())
+                answer = data["choices"][0]["message"]["content"]
+
+                await self._wait_notice(notice)
+                reply = Reply(ReplyType.TEXT, answer)
+                e_context["reply"] = reply
+                e_context.action = EventAction.BREAK_PASS
+                return
+            except Exception as e:
+                logger.error(f"[JinaSum] Error in processing question: {str(e)}")
+                if attempt < self.MAX_RETRIES and self._is_transient_error(e):
+                    await asyncio.sleep(self._retry_delay(attempt))
+                    continue
+                await self._wait_notice(notice)
+                reply = Reply(ReplyType.ERROR, f"抱歉，处理您的问题时出错: {str(e)}")
+                e_context["reply"] = reply
+                e_context.action = EventAction.BREAK_PASS
+                return
 
     def get_help_text(self, verbose=False, **kwargs):
         help_text = "网页内容总结\n"
@@ -502,27 +784,13 @@ class JinaSum(Plugin):
         try:
             plugin_config_path = os.path.join(self.path, "config.json.template")
             if os.path.exists(plugin_config_path):
-                with open(plugin_config_path, "r", encoding="utf-8") as f:
-                    plugin_conf = json.load(f)
+                with open(plugin_config_path, "rb") as f:
+                    plugin_conf = orjson.loads(f.read())
                     return plugin_conf
         except Exception as e:
             logger.exception(e)
 
-    def _get_jina_url(self, target_url):
-        return self.jina_reader_base + "/" + target_url
-
-    def _get_openai_chat_url(self):
-        return self.open_ai_api_base + "/chat/completions"
-
-    def _get_openai_headers(self):
-        return {
-            "Authorization": f"Bearer {self.open_ai_api_key}",
-            "Host": urlparse(self.open_ai_api_base).netloc,
-            "Content-Type": "application/json",
-        }
-
     def _get_openai_payload(self, target_url_content):
-        target_url_content = target_url_content[: self.max_words]
         sum_prompt = f"{self.prompt}\n\n'''{target_url_content}'''"
         messages = [{"role": "user", "content": sum_prompt}]
         payload = {
@@ -531,6 +799,13 @@ class JinaSum(Plugin):
         }
         return payload
 
+    @staticmethod
+    def _compile_prefix_pattern(prefixes):
+        """将前缀列表编译为一个锚定在开头的正则，列表为空时返回 None"""
+        if not prefixes:
+            return None
+        return re.compile("^(?:" + "|".join(re.escape(prefix) for prefix in prefixes) + ")")
+
     def _check_url(self, target_url: str):
         """检查URL是否有效且允许访问
 
@@ -541,18 +816,28 @@ class JinaSum(Plugin):
             bool: URL是否有效且允许访问
         """
         stripped_url = target_url.strip()
-        parsed_url = urlparse(stripped_url)
-        if not parsed_url.scheme or not parsed_url.netloc:
+
+        # 只做字符串扫描：scheme 必须是 http(s)，且 :// 之后的主机部分不能为空
+        index = stripped_url.find("://", 0, 10)
+        if index < 0 or stripped_url[:index].lower() not in ("http", "https"):
+            return False
+        host_start = index + 3
+        if host_start >= len(stripped_url) or stripped_url[host_start] in "/?#":
             return False
 
         # 检查黑名单，黑名单优先
-        for black_url in self.black_url_list:
-            if stripped_url.startswith(black_url):
-                return False
+        if self._black_url_pattern and self._black_url_pattern.match(stripped_url):
+            return False
 
         # 如果有白名单，则检查是否在白名单中
-        if self.white_url_list:
-            if not any(stripped_url.startswith(white_url) for white_url in self.white_url_list):
-                return False
+        if self._white_url_pattern and not self._white_url_pattern.match(stripped_url):
+            return False
+
+        return True
+
 
-        return True
\ No newline at end of file
+@atexit.register
+def _shutdown_active_instance():
+    """进程退出时兜底释放当前插件实例的资源"""
+    if JinaSum._active_instance is not None:
+        JinaSum._active_instance._shutdown()